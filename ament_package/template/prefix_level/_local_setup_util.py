@@ -3,7 +3,9 @@
 # Licensed under the Apache License, Version 2.0
 
 import argparse
+from array import array
 from collections import OrderedDict
+import heapq
 import os
 from pathlib import Path
 import sys
@@ -66,9 +68,9 @@ def main(argv=sys.argv[1:]):  # noqa: D103
     else:
         assert False, 'Unknown primary extension: ' + args.primary_extension
 
-    packages = get_packages(Path(__file__).parent)
+    graph = PackageGraph.from_resource_index(Path(__file__).parent)
 
-    ordered_packages = order_packages(packages)
+    ordered_packages = graph.topological_order()
     for pkg_name in ordered_packages:
         if _include_comments():
             print(
@@ -94,6 +96,27 @@ def get_packages(prefix_path):
       dependencies
     :rtype: dict
     """
+    packages = {
+        name: set(dependencies)
+        for name, dependencies in _read_resource_index(prefix_path).items()}
+
+    # remove unknown dependencies
+    pkg_names = set(packages.keys())
+    for k in packages.keys():
+        packages[k] = {d for d in packages[k] if d in pkg_names}
+
+    return packages
+
+
+def _read_resource_index(prefix_path):
+    """
+    Read the runtime dependencies of all packages in the resource index.
+
+    :param Path prefix_path: The install prefix path of all packages
+    :returns: A mapping from the package name to the list of runtime
+      dependencies as listed in the marker file, including unknown ones
+    :rtype: dict
+    """
     packages = {}
     # since importing ament_index_python isn't feasible here the following
     # constant must match ament_index_python.constants.RESOURCE_INDEX_SUBFOLDER
@@ -107,13 +130,8 @@ def get_packages(prefix_path):
             continue
         if p.name.startswith('.'):
             continue
-        add_package_runtime_dependencies(p, packages)
-
-    # remove unknown dependencies
-    pkg_names = set(packages.keys())
-    for k in packages.keys():
-        packages[k] = {d for d in packages[k] if d in pkg_names}
-
+        name, dependencies = _read_package_runtime_dependencies(p)
+        packages[name] = dependencies
     return packages
 
 
@@ -125,12 +143,206 @@ def add_package_runtime_dependencies(path, packages):
     :param dict packages: A mapping from package names to the sets of runtime
       dependencies to add to
     """
-    dependencies = set()
+    name, dependencies = _read_package_runtime_dependencies(path)
+    packages[name] = set(dependencies)
+
+
+def _read_package_runtime_dependencies(path):
+    dependencies = []
     marker_file = path.parents[1] / 'package_run_dependencies' / path.name
     if marker_file.exists():
         content = marker_file.read_text()
-        dependencies = set(content.split(';') if content else [])
-    packages[marker_file.name] = dependencies
+        dependencies = content.split(';') if content else []
+    return marker_file.name, dependencies
+
+
+class PackageGraph:
+    """
+    Immutable runtime dependency graph of packages.
+
+    Package names are interned to integer ids in alphabetical order and the
+    dependencies are stored in compressed sparse row form: the dependency ids
+    of the package with id ``i`` are ``targets[offsets[i]:offsets[i + 1]]``.
+    Since the graph is never modified it can be shared between ordering,
+    cycle detection and transitive closure queries.
+    """
+
+    __slots__ = ('_names', '_ids', '_offsets', '_targets', '_transposed')
+
+    def __init__(self, packages):
+        """
+        Construct the graph.
+
+        :param dict packages: A mapping from package name to an iterable of
+          runtime dependencies, dependencies which are not a key in the
+          mapping are ignored
+        """
+        self._names = tuple(sorted(packages))
+        self._ids = {name: i for i, name in enumerate(self._names)}
+        self._offsets = array('I', [0])
+        self._targets = array('I')
+        for name in self._names:
+            self._targets.extend(sorted(
+                {self._ids[d] for d in packages[name] if d in self._ids}))
+            self._offsets.append(len(self._targets))
+        self._transposed = None
+
+    @classmethod
+    def from_resource_index(cls, prefix_path):
+        """
+        Create the graph from the ament resource index of a prefix path.
+
+        :param Path prefix_path: The install prefix path of all packages
+        :rtype: PackageGraph
+        """
+        return cls(_read_resource_index(prefix_path))
+
+    def __len__(self):  # noqa: D105
+        return len(self._names)
+
+    def __contains__(self, name):  # noqa: D105
+        return name in self._ids
+
+    @property
+    def names(self):
+        """Return the package names ordered by their id."""
+        return self._names
+
+    def dependencies(self, name):
+        """
+        Get the direct runtime dependencies of a package.
+
+        :param str name: The package name
+        :returns: The dependency names in alphabetical order
+        :rtype: list
+        """
+        return [self._names[j] for j in self._dependency_ids(self._ids[name])]
+
+    def transitive_dependencies(self, name):
+        """
+        Get the recursive runtime dependencies of a package.
+
+        :param str name: The package name
+        :returns: The dependency names in alphabetical order, only including
+          the package itself if it is part of a circular dependency
+        :rtype: list
+        """
+        visited = bytearray(len(self._names))
+        stack = list(self._dependency_ids(self._ids[name]))
+        while stack:
+            i = stack.pop()
+            if visited[i]:
+                continue
+            visited[i] = 1
+            stack.extend(self._dependency_ids(i))
+        return [n for n, v in zip(self._names, visited) if v]
+
+    def topological_order(self):
+        """
+        Order packages topologically.
+
+        Among the packages whose dependencies have all been ordered the
+        alphabetically first one is selected next.
+
+        :returns: The package names
+        :rtype: list
+        :raises RuntimeError: if there is a circular dependency
+        """
+        ordered, remaining = self._order()
+        if len(ordered) < len(self._names):
+            raise RuntimeError(
+                'Circular dependency between: ' +
+                ', '.join(self._reduce_cycle_set(remaining)))
+        return [self._names[i] for i in ordered]
+
+    def cycle_set(self):
+        """
+        Get the packages part of a circular dependency.
+
+        Packages which only depend on a circular dependency are not included.
+        Packages which can't be ordered and which another returned package
+        depends on are included though, e.g. packages in between two circular
+        dependencies.
+
+        :returns: The package names in alphabetical order, empty if there is
+          no circular dependency
+        :rtype: list
+        """
+        ordered, remaining = self._order()
+        if len(ordered) == len(self._names):
+            return []
+        return self._reduce_cycle_set(remaining)
+
+    def _order(self):
+        # returns the ordered ids and the number of not yet ordered
+        # dependencies for each package
+        dependents = self._transpose()
+        remaining = array('I', (
+            self._offsets[i + 1] - self._offsets[i]
+            for i in range(len(self._names))))
+        # ids are assigned alphabetically so the smallest id comes first
+        ready = [i for i, count in enumerate(remaining) if not count]
+        heapq.heapify(ready)
+        ordered = []
+        while ready:
+            i = heapq.heappop(ready)
+            ordered.append(i)
+            for j in dependents._dependency_ids(i):
+                remaining[j] -= 1
+                if not remaining[j]:
+                    heapq.heappush(ready, j)
+        return ordered, remaining
+
+    def _reduce_cycle_set(self, candidates):
+        # drop candidates (packages with a non-zero value) which no other
+        # remaining candidate depends on until nothing changes
+        unordered = bytearray(1 if c else 0 for c in candidates)
+        dependents_count = array('I', [0]) * len(self._names)
+        for i in range(len(self._names)):
+            if unordered[i]:
+                for j in self._dependency_ids(i):
+                    if unordered[j]:
+                        dependents_count[j] += 1
+        stack = [
+            i for i in range(len(self._names))
+            if unordered[i] and not dependents_count[i]]
+        while stack:
+            i = stack.pop()
+            unordered[i] = 0
+            for j in self._dependency_ids(i):
+                if unordered[j]:
+                    dependents_count[j] -= 1
+                    if not dependents_count[j]:
+                        stack.append(j)
+        return [n for n, u in zip(self._names, unordered) if u]
+
+    def _dependency_ids(self, i):
+        return self._targets[self._offsets[i]:self._offsets[i + 1]]
+
+    def _transpose(self):
+        # the graph of dependents, computed once and cached
+        if self._transposed is None:
+            count = len(self._names)
+            transposed = PackageGraph.__new__(PackageGraph)
+            transposed._names = self._names
+            transposed._ids = self._ids
+            transposed._transposed = self
+            offsets = array('I', [0]) * (count + 1)
+            for j in self._targets:
+                offsets[j + 1] += 1
+            for i in range(count):
+                offsets[i + 1] += offsets[i]
+            targets = array('I', [0]) * len(self._targets)
+            position = array('I', offsets)
+            # iterating sources in increasing order keeps each row sorted
+            for i in range(count):
+                for j in self._dependency_ids(i):
+                    targets[position[j]] = i
+                    position[j] += 1
+            transposed._offsets = offsets
+            transposed._targets = targets
+            self._transposed = transposed
+        return self._transposed
 
 
 def order_packages(packages):
@@ -138,29 +350,12 @@ def order_packages(packages):
     Order packages topologically.
 
     :param dict packages: A mapping from package name to the set of runtime
-      dependencies
+      dependencies, which is not modified, dependencies which are not a key in
+      the mapping are ignored
     :returns: The package names
     :rtype: list
     """
-    # select packages with no dependencies in alphabetical order
-    to_be_ordered = list(packages.keys())
-    ordered = []
-    while to_be_ordered:
-        pkg_names_without_deps = [
-            name for name in to_be_ordered if not packages[name]]
-        if not pkg_names_without_deps:
-            reduce_cycle_set(packages)
-            raise RuntimeError(
-                'Circular dependency between: ' + ', '.join(sorted(packages)))
-        pkg_names_without_deps.sort()
-        pkg_name = pkg_names_without_deps[0]
-        to_be_ordered.remove(pkg_name)
-        ordered.append(pkg_name)
-        # remove item from dependency lists
-        for k in list(packages.keys()):
-            if pkg_name in packages[k]:
-                packages[k].remove(pkg_name)
-    return ordered
+    return PackageGraph(packages).topological_order()
 
 
 def reduce_cycle_set(packages):
@@ -170,22 +365,13 @@ def reduce_cycle_set(packages):
     :param dict packages: A mapping from package name to the set of runtime
       dependencies which is modified in place
     """
-    last_depended = None
-    while len(packages) > 0:
-        # get all remaining dependencies
-        depended = set()
-        for pkg_name, dependencies in packages.items():
-            depended = depended.union(dependencies)
-        # remove all packages which are not dependent on
-        for name in list(packages.keys()):
-            if name not in depended:
-                del packages[name]
-        if last_depended:
-            # if remaining packages haven't changed return them
-            if last_depended == depended:
-                return packages.keys()
-        # otherwise reduce again
-        last_depended = depended
+    graph = PackageGraph(packages)
+    cycle_set = set(graph._reduce_cycle_set(bytearray([1]) * len(graph)))
+    for name in list(packages.keys()):
+        if name not in cycle_set:
+            del packages[name]
+    if packages:
+        return packages.keys()
 
 
 def _include_comments():
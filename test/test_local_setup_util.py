@@ -0,0 +1,160 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+
+from ament_package.template.prefix_level._local_setup_util import get_packages
+from ament_package.template.prefix_level._local_setup_util import order_packages
+from ament_package.template.prefix_level._local_setup_util import PackageGraph
+from ament_package.template.prefix_level._local_setup_util import reduce_cycle_set
+import pytest
+
+
+def _create_prefix(prefix_path, packages):
+    resource_index = prefix_path / 'share' / 'ament_index' / 'resource_index'
+    (resource_index / 'packages').mkdir(parents=True)
+    (resource_index / 'package_run_dependencies').mkdir(parents=True)
+    for name, dependencies in packages.items():
+        (resource_index / 'packages' / name).write_text('')
+        (resource_index / 'package_run_dependencies' / name).write_text(
+            ';'.join(dependencies))
+
+
+def test_topological_order():
+    graph = PackageGraph({
+        'a': {'d'},
+        'b': {'c'},
+        'c': set(),
+        'd': set(),
+    })
+    # among the packages without pending dependencies the alphabetically
+    # first one is ordered next
+    assert graph.topological_order() == ['c', 'b', 'd', 'a']
+    assert graph.cycle_set() == []
+
+
+def test_topological_order_cycle():
+    graph = PackageGraph({
+        'a': {'b', 'd'},
+        'b': {'a'},
+        'c': {'a'},
+        'd': set(),
+    })
+    # c only depends on the cycle and d has been ordered, both are trimmed
+    with pytest.raises(RuntimeError) as e:
+        graph.topological_order()
+    assert str(e.value) == 'Circular dependency between: a, b'
+    assert graph.cycle_set() == ['a', 'b']
+
+
+def test_cycle_set_between_cycles():
+    graph = PackageGraph({
+        'a': {'b', 'x'},
+        'b': {'a'},
+        'x': {'y'},
+        'y': {'z'},
+        'z': {'y'},
+    })
+    # x isn't part of a cycle but the cycle of a and b depends on it
+    assert graph.cycle_set() == ['a', 'b', 'x', 'y', 'z']
+
+
+def test_topological_order_self_dependency():
+    graph = PackageGraph({'a': {'a'}, 'b': set()})
+    with pytest.raises(RuntimeError) as e:
+        graph.topological_order()
+    assert str(e.value) == 'Circular dependency between: a'
+    assert graph.cycle_set() == ['a']
+
+
+def test_dependencies():
+    graph = PackageGraph({'a': ['c', 'b', 'unknown'], 'b': [], 'c': []})
+    assert len(graph) == 3
+    assert 'a' in graph
+    assert 'unknown' not in graph
+    assert graph.names == ('a', 'b', 'c')
+    assert graph.dependencies('a') == ['b', 'c']
+    assert graph.dependencies('b') == []
+
+
+def test_transitive_dependencies():
+    graph = PackageGraph({
+        'a': {'b'},
+        'b': {'c'},
+        'c': set(),
+        'd': {'a', 'unknown'},
+    })
+    assert graph.transitive_dependencies('d') == ['a', 'b', 'c']
+    assert graph.transitive_dependencies('c') == []
+
+
+def test_transitive_dependencies_cycle():
+    graph = PackageGraph({
+        'a': {'b'},
+        'b': {'a'},
+        'c': {'a'},
+    })
+    assert graph.transitive_dependencies('a') == ['a', 'b']
+    assert graph.transitive_dependencies('c') == ['a', 'b']
+
+
+def test_from_resource_index(tmp_path):
+    _create_prefix(tmp_path, {
+        'a': ['b', 'unknown'],
+        'b': [],
+        'c': ['a'],
+    })
+    graph = PackageGraph.from_resource_index(tmp_path)
+    assert graph.names == ('a', 'b', 'c')
+    assert graph.dependencies('a') == ['b']
+    assert graph.topological_order() == ['b', 'a', 'c']
+    assert get_packages(tmp_path) == {'a': {'b'}, 'b': set(), 'c': {'a'}}
+
+
+def test_from_resource_index_missing_prefix(tmp_path):
+    graph = PackageGraph.from_resource_index(tmp_path / 'missing')
+    assert len(graph) == 0
+    assert graph.topological_order() == []
+    assert graph.cycle_set() == []
+
+
+def test_order_packages_does_not_modify_argument():
+    packages = {
+        'a': {'b'},
+        'b': set(),
+        'c': {'a', 'b'},
+    }
+    expected = copy.deepcopy(packages)
+    assert order_packages(packages) == ['b', 'a', 'c']
+    assert packages == expected
+
+
+def test_order_packages_unknown_dependency():
+    assert order_packages({'a': {'unknown'}, 'b': {'a'}}) == ['a', 'b']
+
+
+def test_reduce_cycle_set():
+    packages = {
+        'a': {'b'},
+        'b': {'a', 'd'},
+        'c': {'a'},
+        'd': set(),
+    }
+    # d is a dependency of the cycle so it is kept, c only depends on it
+    assert set(reduce_cycle_set(packages)) == {'a', 'b', 'd'}
+    assert set(packages) == {'a', 'b', 'd'}
+
+    packages = {'a': {'b'}, 'b': set()}
+    assert reduce_cycle_set(packages) is None
+    assert packages == {}
@@ -0,0 +1,138 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import random
+import time
+import tracemalloc
+
+from ament_package.template.prefix_level._local_setup_util import PackageGraph
+import pytest
+
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(
+        not os.environ.get('AMENT_PACKAGE_BENCHMARK'),
+        reason='set AMENT_PACKAGE_BENCHMARK=1 to run the benchmarks'),
+]
+
+
+def _order_packages_dict_of_sets(packages):
+    # the ordering before PackageGraph, which modifies the packages in place
+    to_be_ordered = list(packages.keys())
+    ordered = []
+    while to_be_ordered:
+        pkg_names_without_deps = [
+            name for name in to_be_ordered if not packages[name]]
+        if not pkg_names_without_deps:
+            _reduce_cycle_set_dict_of_sets(packages)
+            raise RuntimeError(
+                'Circular dependency between: ' + ', '.join(sorted(packages)))
+        pkg_names_without_deps.sort()
+        pkg_name = pkg_names_without_deps[0]
+        to_be_ordered.remove(pkg_name)
+        ordered.append(pkg_name)
+        for k in list(packages.keys()):
+            if pkg_name in packages[k]:
+                packages[k].remove(pkg_name)
+    return ordered
+
+
+def _reduce_cycle_set_dict_of_sets(packages):
+    # the cycle reduction before PackageGraph
+    last_depended = None
+    while len(packages) > 0:
+        depended = set()
+        for pkg_name, dependencies in packages.items():
+            depended = depended.union(dependencies)
+        for name in list(packages.keys()):
+            if name not in depended:
+                del packages[name]
+        if last_depended:
+            if last_depended == depended:
+                return packages.keys()
+        last_depended = depended
+
+
+def _generate_packages(count, with_cycle, dependency_count=6, seed=1):
+    # random graph where each package depends on up to dependency_count
+    # packages generated before it, returned as lists like the resource index
+    rng = random.Random(seed)
+    names = ['pkg_%06d' % i for i in range(count)]
+    rng.shuffle(names)
+    packages = {}
+    for i, name in enumerate(names):
+        packages[name] = rng.sample(names[:i], min(i, dependency_count))
+    if with_cycle:
+        packages[names[count // 10]].append(names[-1])
+    return packages
+
+
+def _build_graph(packages):
+    graph = PackageGraph(packages)
+    graph._transpose()
+    return graph
+
+
+def _measure(function):
+    # time without tracing since tracemalloc slows down allocations
+    start = time.perf_counter()
+    result = function()
+    duration = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    try:
+        result = function()
+        memory = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, memory, duration
+
+
+def _order_or_error(function):
+    try:
+        return function()
+    except RuntimeError as e:
+        return str(e)
+
+
+@pytest.mark.parametrize('count', [500, 2000])
+@pytest.mark.parametrize('with_cycle', [False, True])
+def test_benchmark(count, with_cycle):
+    packages = _generate_packages(count, with_cycle)
+
+    dict_of_sets, dict_memory, dict_build_time = _measure(
+        lambda: {name: set(deps) for name, deps in packages.items()})
+    # include the cached graph of dependents which the ordering builds
+    graph, graph_memory, graph_build_time = _measure(
+        lambda: _build_graph(packages))
+
+    start = time.perf_counter()
+    dict_result = _order_or_error(
+        lambda: _order_packages_dict_of_sets(dict_of_sets))
+    dict_order_time = time.perf_counter() - start
+    start = time.perf_counter()
+    graph_result = _order_or_error(graph.topological_order)
+    graph_order_time = time.perf_counter() - start
+
+    print(
+        f'\n{count} packages, cycle: {with_cycle}\n'
+        f'  dict-of-sets: {dict_memory / 1e6:.2f} MB, '
+        f'build {dict_build_time:.4f} s, order {dict_order_time:.4f} s\n'
+        f'  PackageGraph: {graph_memory / 1e6:.2f} MB, '
+        f'build {graph_build_time:.4f} s, order {graph_order_time:.4f} s')
+
+    assert graph_result == dict_result
+    assert graph_memory < dict_memory